@@ -0,0 +1,29 @@
+class AdaptiveBatchSize:
+    """
+    Batch size that adapts to how much the LLM manages to answer in one response.
+    It is halved whenever a response is truncated, and grown by 25% after a run of
+    complete responses, staying between `minimum` and `maximum`.
+    """
+
+    def __init__(self, initial: int, minimum: int = 16, maximum: int = 400, grow_after: int = 5):
+        if initial < 1:
+            raise ValueError("initial must be at least 1")
+        self.size = initial
+        self.minimum = min(minimum, initial)
+        self.maximum = max(maximum, initial)
+        self.grow_after = grow_after
+        self.complete_streak = 0
+
+    def record(self, batch_size: int, truncated: bool):
+        """Adjust the size after a response to a batch of `batch_size` words."""
+        if truncated:
+            # Halve relative to the batch that was truncated, so that several truncated
+            # batches that were in flight at the same time only shrink the size once
+            self.size = max(self.minimum, min(self.size, batch_size // 2))
+            self.complete_streak = 0
+            return
+
+        self.complete_streak += 1
+        if self.complete_streak >= self.grow_after:
+            self.size = min(self.maximum, self.size + max(1, self.size // 4))
+            self.complete_streak = 0
@@ -0,0 +1,37 @@
+import hashlib
+import sqlite3
+from typing import List, Dict, Optional
+
+import orjson
+
+
+def cache_key(model: str, prompt: str, words_batch: List[str]) -> str:
+    """Build a deterministic cache key for scoring a batch of words with a model and prompt."""
+    text = f"{model}\0{prompt}\0" + "\n".join(sorted(words_batch))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """On-disk cache of parsed LLM batch responses, backed by SQLite."""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, scores TEXT NOT NULL)")
+
+    def get(self, key: str) -> Optional[Dict[str, int]]:
+        """Return the cached scores for a key, or None on a cache miss."""
+        row = self.conn.execute("SELECT scores FROM responses WHERE key = ?", (key,)).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def put(self, key: str, scores: Dict[str, int]):
+        """Store the scores for a key, replacing any previous entry."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO responses (key, scores) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET scores = excluded.scores",
+                (key, orjson.dumps(scores).decode('utf-8'))
+            )
+
+    def close(self):
+        self.conn.close()
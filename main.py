@@ -1,13 +1,60 @@
 import argparse
-import json
+import asyncio
+import collections
+import functools
+import io
+import itertools
 import locale
 import os
+import random
 import sys
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Iterable, List, Dict, Optional, Tuple
 
-import requests
+import httpx
+import orjson
 from dotenv import load_dotenv
 
+try:
+    import icu
+except ImportError:
+    icu = None
+
+from batch_size import AdaptiveBatchSize
+from cache import ResponseCache, cache_key
+from rate_limit import RateLimiter
+from score_store import ScoreStore
+
+if TYPE_CHECKING:
+    from semantic_cache import SemanticCache
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Rate limited and transient server errors are retried with exponential backoff
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 5
+
+# Rough number of output tokens per word:score line, used to size max_tokens for a batch
+TOKENS_PER_SCORED_WORD = 8
+
+# Score files at least this large are parsed by several processes in the filter command
+PARALLEL_PARSE_MIN_SIZE = 64 * 1024 * 1024
+
+# Turkish alphabet order: a, b, c, ç, d, e, f, g, ğ, h, ı, i, j, k, l, m, n, o, ö, p, r, s, ş, t, u, ü, v, y, z
+TURKISH_SORT_TRANSLATION = str.maketrans({
+    'ç': 'c\u0327',  # c comes before ç
+    'ğ': 'g\u0327',  # g comes before ğ
+    'ı': 'i\u0326',  # ı comes before i
+    'i': 'i\u0327',  # i comes after ı
+    'ö': 'o\u0327',  # o comes before ö
+    'ş': 's\u0327',  # s comes before ş
+    'ü': 'u\u0327',  # u comes before ü
+})
+
+# Batches currently being scored, keyed by cache key, so that identical batches
+# scored at the same time share a single API request
+_inflight: Dict[str, asyncio.Future] = {}
+
 
 def main():
     """Main function to run the word filtering process."""
@@ -16,7 +63,8 @@ def main():
 
     if args.command == 'filter':
         # Filter already scored words
-        filter_scored_words(args.input_file, args.output_file, args.min_score)
+        filter_scored_words(args.input_file, args.output_file, args.min_score, workers=args.workers,
+                            scores_db=args.scores_db)
     else:  # args.command == 'score'
         # Load environment variables
         load_dotenv()
@@ -46,17 +94,45 @@ def main():
         debug_print(args.debug, prompt)
         debug_print(args.debug, "-----------------\n")
 
+        # Open the response cache and the score database unless they were disabled with an empty path
+        cache = ResponseCache(args.cache_path) if args.cache_path else None
+        score_store = ScoreStore(args.scores_db) if args.scores_db else None
+
+        # The semantic cache needs optional dependencies, so only import it when requested
+        semantic_cache = None
+        if args.semantic_cache:
+            try:
+                from semantic_cache import SemanticCache
+            except ImportError as e:
+                print(f"Error: --semantic-cache requires optional dependencies: {e}")
+                print("Install them with: uv pip install -e '.[semantic]'")
+                sys.exit(1)
+            semantic_cache = SemanticCache(args.semantic_cache_path, threshold=args.sem_threshold)
+
         # Score words using the LLM in batches and persist results
         print(f"Scoring words using {model} in batches of {args.batch_size}...")
-        all_scores = score_words_with_llm(
-            words,
-            prompt,
-            model,
-            api_key,
-            batch_size=args.batch_size,
-            all_scores_file=args.all_scores_file,
-            debug=args.debug
-        )
+        try:
+            all_scores = asyncio.run(score_words_with_llm(
+                words,
+                prompt,
+                model,
+                api_key,
+                batch_size=args.batch_size,
+                all_scores_file=args.all_scores_file,
+                score_store=score_store,
+                concurrency=args.concurrency,
+                requests_per_minute=args.requests_per_minute,
+                cache=cache,
+                semantic_cache=semantic_cache,
+                debug=args.debug
+            ))
+        finally:
+            if cache:
+                cache.close()
+            if score_store:
+                score_store.close()
+            if semantic_cache:
+                semantic_cache.save()
 
         # Print summary
         print(f"Processed {len(all_scores)} words. Use the 'filter' command to filter words based on scores.")
@@ -71,16 +147,25 @@ def parse_arguments():
     score_parser = subparsers.add_parser('score', help='Score words using an LLM')
     score_parser.add_argument('input_file', help='Path to the input file containing words (one per line)')
     score_parser.add_argument('--prompt-file', default='prompt.txt', help='Path to the file containing the prompt (default: prompt.txt)')
-    score_parser.add_argument('--all-scores-file', default='all_words_scores.txt', help='Path to save all words with scores (default: all_words_scores.txt)')
+    score_parser.add_argument('--all-scores-file', default='all_words_scores.txt', help='Path of the text file new scores are appended to, as an export of the score database; without a database, words already in it are not scored again (default: all_words_scores.txt)')
+    score_parser.add_argument('--scores-db', default='scores.sqlite', help='Path to the database of all scored words, used to skip already scored words, imported from the all scores file on first use, empty to use the all scores file instead (default: scores.sqlite)')
     score_parser.add_argument('--model', help='OpenRouter model to use (default: from .env or claude-3.5-sonnet)')
-    score_parser.add_argument('--batch-size', type=int, default=100, help='Number of words to process in each batch (default: 100)')
+    score_parser.add_argument('--batch-size', type=int, default=100, help='Number of words to process in each batch at first, adapted to truncated and complete responses during the run (default: 100)')
+    score_parser.add_argument('--concurrency', type=int, default=16, help='Maximum number of batches sent to the API at the same time (default: 16)')
+    score_parser.add_argument('--requests-per-minute', type=float, help='Maximum number of API requests started per minute (default: only limited by the rate limit headers of the API)')
+    score_parser.add_argument('--cache-path', default='.llmcache.sqlite', help='Path to the cache of LLM responses, empty to disable caching (default: .llmcache.sqlite)')
+    score_parser.add_argument('--semantic-cache', action='store_true', help='Reuse the score of a very similar, already scored word instead of asking the LLM (approximate, needs the "semantic" extra)')
+    score_parser.add_argument('--semantic-cache-path', default='.semantic_cache', help='Path prefix of the semantic cache index files (default: .semantic_cache)')
+    score_parser.add_argument('--sem-threshold', type=float, default=0.92, help='Minimum cosine similarity to reuse a score from the semantic cache (default: 0.92)')
     score_parser.add_argument('--debug', action='store_true', help='Enable debug output')
 
     # Filter command - new functionality
     filter_parser = subparsers.add_parser('filter', help='Filter already scored words based on a threshold')
     filter_parser.add_argument('--input-file', default='all_words_scores.txt', help='Path to the input file containing scored words (default: all_words_scores.txt)')
+    filter_parser.add_argument('--scores-db', help='Path to a database of scored words written by the score command, read instead of the input file')
     filter_parser.add_argument('--output-file', default='filtered_words.txt', help='Path to save the filtered words (default: filtered_words.txt)')
     filter_parser.add_argument('--min-score', type=int, default=90, help='Minimum score to keep a word (default: 90)')
+    filter_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of processes used to parse input files of 64 MiB or more (default: number of CPUs)')
 
     # For backward compatibility, if no command is provided, default to 'score'
     args = parser.parse_args()
@@ -93,10 +178,19 @@ def parse_arguments():
             parser.print_help()
             sys.exit(1)
 
+    if args.command == 'score':
+        if args.batch_size < 1:
+            parser.error("--batch-size must be at least 1")
+        if args.concurrency < 1:
+            parser.error("--concurrency must be at least 1")
+        if args.requests_per_minute is not None and args.requests_per_minute <= 0:
+            parser.error("--requests-per-minute must be positive")
+
     return args
 
 
-def filter_scored_words(input_file: str, output_file: str, min_score: int):
+def filter_scored_words(input_file: str, output_file: str, min_score: int, workers: int = 1,
+                        scores_db: Optional[str] = None):
     """
     Filter already scored words based on a threshold.
 
@@ -104,56 +198,40 @@ def filter_scored_words(input_file: str, output_file: str, min_score: int):
         input_file: Path to the input file containing scored words (word:score format)
         output_file: Path to save the filtered words
         min_score: Minimum score to keep a word
+        workers: Number of processes used to parse large input files
+        scores_db: Path to a score database to query instead of reading input_file
     """
     try:
-        # Read scored words from input file
-        print(f"Reading scored words from {input_file}...")
-        all_scores = {}
-        total_lines = 0
-        skipped_lines = 0
-        duplicate_words = 0
-
-        with open(input_file, 'r', encoding='utf-8') as file:
-            for line in file:
-                total_lines += 1
-                line = line.strip()
-                if not line:
-                    skipped_lines += 1
-                    continue
-                if ':' not in line:
-                    print(f"Warning: Line {total_lines} does not contain a colon: '{line}'")
-                    skipped_lines += 1
-                    continue
-
-                word, score_str = line.split(':', 1)
-                word = word.strip()
-
-                try:
-                    score = int(score_str.strip())
-                    if word in all_scores:
-                        duplicate_words += 1
-                        # Keep the highest score for duplicate words
-                        all_scores[word] = max(all_scores[word], score)
-                    else:
-                        all_scores[word] = score
-                except ValueError:
-                    print(f"Warning: Line {total_lines} does not have a valid integer score: '{line}'")
-                    skipped_lines += 1
-                    continue
+        if scores_db:
+            # Connecting would silently create an empty database for a mistyped path
+            if not os.path.exists(scores_db):
+                print(f"Error: Score database '{scores_db}' not found.")
+                sys.exit(1)
+
+            # Only the matching words are read, using the index on the score
+            print(f"Reading words with scores >= {min_score} from {scores_db}...")
+            score_store = ScoreStore(scores_db)
+            try:
+                filtered_words = score_store.get_words_with_min_score(min_score)
+            finally:
+                score_store.close()
+        else:
+            # Read scored words from input file
+            print(f"Reading scored words from {input_file}...")
+            all_scores = read_scores_from_file(input_file, verbose=True, workers=workers)
 
-        print(f"Total lines in file: {total_lines}")
-        print(f"Skipped lines: {skipped_lines}")
-        print(f"Duplicate words: {duplicate_words}")
-        print(f"Read {len(all_scores)} unique scored words.")
+            # Filter words based on threshold
+            filtered_words = [word for word, score in all_scores.items() if score >= min_score]
 
-        # Filter words based on threshold
-        filtered_words = {word: score for word, score in all_scores.items() if score >= min_score}
+        # Sort words according to Turkish alphabet, computing each sort key once up front.
+        # Words with equal sort keys are ordered by the word itself, independent of input order.
+        sort_key = get_turkish_sort_key()
+        sorted_words = [(sort_key(word), word) for word in filtered_words]
+        sorted_words.sort()
 
         # Save filtered words to output file
-        with open(output_file, 'w', encoding='utf-8') as file:
-            # Sort words according to Turkish alphabet
-            for word in sorted(filtered_words.keys(), key=turkish_sort_key):
-                file.write(f"{word}\n")
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as file:
+            file.writelines(f"{word}\n" for _, word in sorted_words)
 
         print(f"Filtered {len(filtered_words)} words with scores >= {min_score}.")
         print(f"Filtered words saved to {output_file}")
@@ -163,6 +241,129 @@ def filter_scored_words(input_file: str, output_file: str, min_score: int):
         sys.exit(1)
 
 
+def read_scores_from_file(file_path: str, verbose: bool = False, workers: int = 1) -> Dict[str, int]:
+    """
+    Read scored words from a file in word:score format.
+    Keeps the highest score for words that appear more than once.
+    Files of at least PARALLEL_PARSE_MIN_SIZE bytes are split into chunks parsed by up to `workers` processes.
+    If verbose is enabled, prints warnings for malformed lines and a summary.
+    """
+    file_size = os.path.getsize(file_path)
+    if workers > 1 and file_size >= PARALLEL_PARSE_MIN_SIZE:
+        boundaries = find_chunk_boundaries(file_path, file_size, workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(parse_scores_chunk, itertools.repeat(file_path),
+                                       boundaries[:-1], boundaries[1:]))
+    else:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            chunks = [parse_score_lines(file)]
+
+    # Merge the chunks in file order, keeping the highest score for duplicate words
+    all_scores = {}
+    total_lines = 0
+    skipped_lines = 0
+    duplicate_words = 0
+    for chunk_scores, chunk_lines, chunk_skipped_lines, chunk_duplicate_words, warnings in chunks:
+        for line_number, warning in warnings:
+            debug_print(verbose, f"Warning: Line {total_lines + line_number} {warning}")
+
+        if not all_scores:
+            all_scores = chunk_scores
+        else:
+            for word, score in chunk_scores.items():
+                previous_score = all_scores.get(word)
+                if previous_score is None:
+                    all_scores[word] = score
+                else:
+                    chunk_duplicate_words += 1
+                    if score > previous_score:
+                        all_scores[word] = score
+
+        total_lines += chunk_lines
+        skipped_lines += chunk_skipped_lines
+        duplicate_words += chunk_duplicate_words
+
+    debug_print(verbose, f"Total lines in file: {total_lines}")
+    debug_print(verbose, f"Skipped lines: {skipped_lines}")
+    debug_print(verbose, f"Duplicate words: {duplicate_words}")
+    debug_print(verbose, f"Read {len(all_scores)} unique scored words.")
+
+    return all_scores
+
+
+def find_chunk_boundaries(file_path: str, file_size: int, chunk_count: int) -> List[int]:
+    """Split a file into byte ranges of roughly equal size that each start at the beginning of a line."""
+    boundaries = [0]
+    with open(file_path, 'rb') as file:
+        for i in range(1, chunk_count):
+            file.seek(max(file_size * i // chunk_count, boundaries[-1]))
+            # Move to the start of the next line
+            file.readline()
+            boundaries.append(file.tell())
+    boundaries.append(file_size)
+    return sorted(set(boundaries))
+
+
+def parse_scores_chunk(file_path: str, start: int, end: int):
+    """Parse the scored words in a byte range of a file. Runs in a worker process."""
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    # newline=None gives the same universal newline handling as a file opened in text mode
+    return parse_score_lines(io.StringIO(data.decode('utf-8'), newline=None))
+
+
+def parse_score_lines(lines: Iterable[str]):
+    """
+    Parse lines in word:score format, keeping the highest score for words that appear more than once.
+    Returns the scores, the number of lines, skipped lines and duplicate words, and a list of
+    (line number, warning) pairs for malformed lines.
+    """
+    all_scores = {}
+    total_lines = 0
+    skipped_lines = 0
+    duplicate_words = 0
+    warnings = []
+    # This loop is kept over a regex scan of a memory-mapped file: on a 2M line file the regex
+    # alone takes as long as splitting the lines, and the per-word dict updates dominate either way
+    # Local aliases avoid attribute lookups in the per-line loop
+    get_score = all_scores.get
+    strip = str.strip
+
+    for line in lines:
+        total_lines += 1
+        line = strip(line)
+        if not line:
+            skipped_lines += 1
+            continue
+        word, colon, score_str = line.partition(':')
+        if not colon:
+            warnings.append((total_lines, f"does not contain a colon: '{line}'"))
+            skipped_lines += 1
+            continue
+
+        word = strip(word)
+
+        try:
+            # int() ignores surrounding whitespace
+            score = int(score_str)
+        except ValueError:
+            warnings.append((total_lines, f"does not have a valid integer score: '{line}'"))
+            skipped_lines += 1
+            continue
+
+        previous_score = get_score(word)
+        if previous_score is None:
+            all_scores[word] = score
+        else:
+            duplicate_words += 1
+            # Keep the highest score for duplicate words
+            if score > previous_score:
+                all_scores[word] = score
+
+    return all_scores, total_lines, skipped_lines, duplicate_words, warnings
+
+
 def read_words_from_file(file_path: str) -> List[str]:
     """Read words from a text file, one word per line."""
     try:
@@ -189,68 +390,305 @@ def read_prompt_from_file(file_path: str) -> str:
         sys.exit(1)
 
 
-def score_words_with_llm(words: List[str], prompt: str, model: str, api_key: str,
-                         batch_size: int = 100,
-                         all_scores_file: str = "all_words_scores.txt",
-                         debug: bool = False) -> Dict[str, int]:
+async def score_words_with_llm(words: List[str], prompt: str, model: str, api_key: str,
+                               batch_size: int = 100,
+                               all_scores_file: str = "all_words_scores.txt",
+                               score_store: ScoreStore = None,
+                               concurrency: int = 16,
+                               requests_per_minute: Optional[float] = None,
+                               cache: ResponseCache = None,
+                               semantic_cache: "SemanticCache" = None,
+                               debug: bool = False) -> Dict[str, int]:
     """
     Score words using the specified LLM model via OpenRouter API.
-    Processes words in batches and persists results after each batch.
+    Repeated words are scored once.
+    Words already present in `score_store` (or in `all_scores_file` without a store) keep their
+    stored score and are not sent again, and neither are words the LLM omitted from a complete
+    response in an earlier run when `score_store` is given.
+    The remaining words are processed in batches, with up to `concurrency` batches in flight
+    at once and at most `requests_per_minute` requests started per minute, and results
+    are added to `score_store` and appended to `all_scores_file` after each batch.
+    Batches start at `batch_size` words; the size shrinks when responses get truncated
+    (the rest of a truncated batch is sent again) and grows while they are complete.
+    Batches already answered for the same model and prompt are served from `cache`, and
+    words close enough to a word in `semantic_cache` reuse that word's score.
     Returns a dictionary of all word scores.
     """
     if not words:
         return {}
 
-    # Initialize all_scores_file
-    with open(all_scores_file, 'w', encoding='utf-8') as all_file:
-        pass  # Create empty file
-
-    all_scores = {}
-
-    # Process words in batches
-    for i in range(0, len(words), batch_size):
-        batch = words[i:i+batch_size]
-        print(f"Processing batch {i//batch_size + 1}/{(len(words) + batch_size - 1)//batch_size} ({len(batch)} words)...")
+    # Drop repeated words, keeping their first occurrence, so that each word is sent only once
+    unique_words = list(dict.fromkeys(words))
+    if len(unique_words) < len(words):
+        print(f"Deduplicated {len(words)} → {len(unique_words)} words.")
+    words = unique_words
+
+    # Reuse scores persisted by previous runs and only send words that were never scored
+    if score_store:
+        if score_store.is_empty() and os.path.exists(all_scores_file):
+            # Carry over scores written before the score database was used
+            print(f"Importing scores from {all_scores_file} into the score database...")
+            score_store.add_scores(read_scores_from_file(all_scores_file))
+        known = score_store.get_scores(words)
+        omitted = score_store.get_omitted_words(words)
+    else:
+        known = read_scores_from_file(all_scores_file) if os.path.exists(all_scores_file) else {}
+        omitted = set()
+    all_scores = {word: known[word] for word in words if word in known}
+    to_score = [word for word in words if word not in known and word not in omitted]
+    print(f"Found {len(all_scores)} already scored words and {len(omitted)} words omitted by the LLM before, "
+          f"{len(to_score)} words left to score.")
+
+    results = asyncio.Queue()
+
+    similar_scores = {}
+    if semantic_cache:
+        # Index words that were scored before the semantic cache was enabled, or by the LLM since
+        # it was last saved; words given a reused score in earlier runs are skipped
+        semantic_cache.add(score_store.get_all_scores() if score_store else known)
+        similar_scores = semantic_cache.lookup(to_score)
+        to_score = [word for word in to_score if word not in similar_scores]
+        print(f"Reusing scores of similar words for {len(similar_scores)} words, {len(to_score)} words left to score.")
+        # Persist the reused scores along with the scores from the LLM
+        results.put_nowait((similar_scores, []))
+
+    pending = collections.deque(to_score)
+    adaptive_batch_size = AdaptiveBatchSize(batch_size)
+    rate_limiter = RateLimiter(requests_per_minute)
+    batch_number = 0
+    # Batches being scored; while any are, their truncated tails may still come back to `pending`
+    batches_in_flight = 0
+    work_changed = asyncio.Condition()
+
+    async def score_batches(client: httpx.AsyncClient):
+        nonlocal batches_in_flight
+        # Each worker takes the next batch of words at the current batch size until none are
+        # left and no batch that could put words back is being scored anymore
+        while True:
+            async with work_changed:
+                await work_changed.wait_for(lambda: pending or not batches_in_flight)
+                if not pending:
+                    return
+                batch = [pending.popleft() for _ in range(min(adaptive_batch_size.size, len(pending)))]
+                batches_in_flight += 1
+            try:
+                await score_batch(client, batch)
+            finally:
+                async with work_changed:
+                    batches_in_flight -= 1
+                    work_changed.notify_all()
+
+    async def score_batch(client: httpx.AsyncClient, batch: List[str]):
+        nonlocal batch_number
+        batch_number += 1
+        print(f"Processing batch {batch_number} ({len(batch)} words, {len(pending)} words left)...")
+        response = await score_words_batch_with_llm(client, rate_limiter, batch, prompt, model,
+                                                    cache=cache, adaptive_batch_size=adaptive_batch_size, debug=debug)
+        if response is None:
+            return
+
+        batch_scores, truncated = response
+        # The prompt has the LLM omit low scoring words, so words missing from a complete
+        # response are remembered to not send them again on later runs. A response without
+        # any scores is more likely a malformed answer than a batch of only low scoring words.
+        omitted_words = [] if truncated or not batch_scores else [word for word in batch if word not in batch_scores]
+        if truncated:
+            # Words after the last answered one were cut off, so send them again
+            answered = [index for index, word in enumerate(batch) if word in batch_scores]
+            unanswered = batch[answered[-1] + 1:] if answered else batch
+            if unanswered is batch and len(batch) <= adaptive_batch_size.minimum:
+                print(f"Error: Response truncated even for a batch of {len(batch)} words, skipping them.")
+            else:
+                print(f"Response truncated, scoring the last {len(unanswered)} words of the batch again...")
+                pending.extendleft(reversed(unanswered))
+
+        await results.put((batch_scores, omitted_words))
+
+    async def write_results():
+        # A single writer keeps the file open for the whole run and persists each batch as
+        # soon as it completes, so lines from concurrently finishing batches never interleave
+        with open(all_scores_file, 'a', encoding='utf-8', buffering=1 << 20) as all_file:
+            while (result := await results.get()) is not None:
+                batch_scores, omitted_words = result
+                # Update all scores dictionary
+                all_scores.update(batch_scores)
+                if score_store:
+                    score_store.add_scores(batch_scores)
+                    if omitted_words:
+                        score_store.add_omitted_words(omitted_words)
+
+                # Persist results immediately, with a single write per batch
+                all_file.write("".join(f"{word}:{score}\n" for word, score in batch_scores.items()))
+                all_file.flush()
 
-        # Score the current batch
-        batch_scores = score_words_batch_with_llm(batch, prompt, model, api_key, debug=debug)
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "http://localhost",
+        "X-Title": "LLM Wordlist Filter"
+    }
 
-        # Update all scores dictionary
-        all_scores.update(batch_scores)
+    # One client for the whole run: with HTTP/2 concurrent batches are multiplexed over a single
+    # connection, which is kept alive between batches long enough to survive rate limit backoff pauses
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency, keepalive_expiry=60)
+    timeout = httpx.Timeout(300, connect=10)
+    async with httpx.AsyncClient(http2=True, headers=headers, limits=limits, timeout=timeout) as client:
+        writer = asyncio.create_task(write_results())
+        await asyncio.gather(*(score_batches(client) for _ in range(concurrency)))
+        await results.put(None)
+        await writer
 
-        # Persist results immediately
-        with open(all_scores_file, 'a', encoding='utf-8') as all_file:
-            for word, score in batch_scores.items():
-                all_file.write(f"{word}:{score}\n")
+    if semantic_cache:
+        # Words with a reused score are left out of the index by the semantic cache itself
+        semantic_cache.add(all_scores)
 
     return all_scores
 
 
-def score_words_batch_with_llm(words_batch: List[str], prompt: str, model: str, api_key: str, debug: bool = False) -> Dict[str, int]:
+async def score_words_batch_with_llm(client: httpx.AsyncClient, rate_limiter: RateLimiter,
+                                     words_batch: List[str], prompt: str, model: str,
+                                     cache: ResponseCache = None,
+                                     adaptive_batch_size: AdaptiveBatchSize = None,
+                                     debug: bool = False) -> Optional[Tuple[Dict[str, int], bool]]:
     """
     Score a batch of words using the specified LLM model via OpenRouter API.
-    Uses prompt caching for efficiency.
+    Skips the API call entirely when the same batch was already scored with this
+    model and prompt, and waits for the result instead when it is being scored right now.
+    Only responses from the API are recorded in `adaptive_batch_size`.
+    Returns the scores and whether the response was truncated, or None if the request failed.
     """
     if not words_batch:
-        return {}
+        return {}, False
+
+    key = cache_key(model, prompt, words_batch)
+    if cache:
+        cached_scores = cache.get(key)
+        # Empty entries may have been cached before empty responses were rejected
+        if cached_scores:
+            debug_print(debug, f"Cache hit for batch {key}")
+            return cached_scores, False
+
+    # No await between the lookup and installing the future, so no lock is needed
+    if key in _inflight:
+        debug_print(debug, f"Waiting for identical in-flight batch {key}")
+        return await _inflight[key]
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        response = await request_scores_from_llm(client, rate_limiter, words_batch, prompt, model, debug=debug)
+        if adaptive_batch_size and response is not None:
+            adaptive_batch_size.record(len(words_batch), response[1])
+        # Only complete responses with scores are cached, a truncated one is missing scores
+        if cache and response is not None and not response[1]:
+            cache.put(key, response[0])
+        future.set_result(response)
+        return response
+    finally:
+        del _inflight[key]
+        # Don't leave waiters hanging if the request failed
+        if not future.done():
+            future.cancel()
+
+
+async def request_scores_from_llm(client: httpx.AsyncClient, rate_limiter: RateLimiter,
+                                  words_batch: List[str], prompt: str, model: str,
+                                  debug: bool = False) -> Optional[Tuple[Dict[str, int], bool]]:
+    """
+    Send a batch of words to the specified LLM model via OpenRouter API and parse the scores.
+    Uses prompt caching for efficiency, and allows enough output tokens for the size of the batch.
+    Returns the scores and whether the response was truncated at the token limit, or None if
+    the request kept failing, the response doesn't have the expected format, the response
+    ended for any reason other than finishing normally or reaching the token limit, or a
+    normally finished response doesn't contain any scores.
+    """
+    # Join words with newlines for the prompt, and only serialize them and max_tokens
+    # into the payload since the rest of it is the same for every batch
+    max_tokens = max(1024, len(words_batch) * TOKENS_PER_SCORED_WORD)
+    prefix, middle, suffix = build_payload_envelope(model, prompt)
+    body = prefix + orjson.dumps("\n".join(words_batch)) + middle + b"%d" % max_tokens + suffix
 
-    # Prepare the API request
-    url = "https://openrouter.ai/api/v1/chat/completions"
+    # Log the request content for debugging
+    if debug:
+        debug_print(debug, "Request content:")
+        debug_print(debug, orjson.dumps(orjson.loads(body), option=orjson.OPT_INDENT_2).decode('utf-8'))
+        debug_print(debug, "")
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "http://localhost",
-        "X-Title": "LLM Wordlist Filter"
-    }
+    try:
+        result = await post_with_retries(client, rate_limiter, body)
+        if result is None:
+            return None
+
+        # Log the full API response for debugging, pretty-printing it only when it will be shown
+        if debug:
+            debug_print(debug, "Full API response:")
+            debug_print(debug, orjson.dumps(result, option=orjson.OPT_INDENT_2).decode('utf-8'))
+            debug_print(debug, "")
+
+        # Check if choices array exists and is not empty
+        if "choices" in result and result["choices"] and "message" in result["choices"][0] and "content" in result["choices"][0]["message"]:
+            content = result["choices"][0]["message"]["content"]
+            finish_reason = result["choices"][0].get("finish_reason")
+            if finish_reason not in ("stop", "length"):
+                # A filtered, failed or refused response says nothing about the words in the batch
+                print(f"Error: LLM response ended with finish reason '{finish_reason}', skipping the batch.")
+                return None
+            truncated = finish_reason == "length"
+
+            # Log the raw LLM response content to the console for debugging
+            debug_print(debug, "Raw LLM response content:")
+            debug_print(debug, content)
+            debug_print(debug, "")
+
+            lines = content.splitlines()
+            if truncated and not content.endswith("\n"):
+                # The last line may have been cut off in the middle of the score
+                lines = lines[:-1]
+
+            # Parse the response to extract word:score pairs
+            scores = {}
+            for line in lines:
+                word, colon, score_str = line.partition(':')
+                if not colon:
+                    continue
+                try:
+                    # int() ignores surrounding whitespace
+                    scores[word.strip()] = int(score_str)
+                except ValueError:
+                    # Skip lines that don't have a valid integer score
+                    continue
+
+            if not truncated and not scores:
+                # Not worth caching or treating as an answer, the words are sent again on the next run
+                print("Error: LLM response doesn't contain any word:score lines, skipping the batch.")
+                return None
+
+            return scores, truncated
+        else:
+            print("Error: Unexpected API response format. Missing expected fields in the response.")
+            if debug:
+                debug_print(debug, "Full API response structure:")
+                debug_print(debug, orjson.dumps(result, option=orjson.OPT_INDENT_2).decode('utf-8'))
+            return None
+
+    except Exception as e:
+        print(f"Error calling OpenRouter API: {e}")
+        sys.exit(1)
 
-    # Join words with newlines for the prompt
-    words_text = "\n".join(words_batch)
+
+@functools.cache
+def build_payload_envelope(model: str, prompt: str) -> Tuple[bytes, bytes, bytes]:
+    """
+    Serialize the request payload around the parts that change per batch, once per model and prompt.
+    Returns the JSON before the (JSON encoded) text of the user message, between it and
+    the max_tokens value, and after the max_tokens value.
+    """
+    words_placeholder = "\0words\0"
+    max_tokens_placeholder = "\0max_tokens\0"
 
     # Prepare the payload with prompt caching
     payload = {
         "model": model,
-        "max_tokens": 1024,
         "messages": [
             {
                 "role": "system",
@@ -267,98 +705,98 @@ def score_words_batch_with_llm(words_batch: List[str], prompt: str, model: str,
                 "content": [
                     {
                         "type": "text",
-                        "text": words_text
+                        "text": words_placeholder
                     }
                 ]
             }
-        ]
+        ],
+        "max_tokens": max_tokens_placeholder
     }
 
-    # Log the request content for debugging
-    debug_print(debug, "Request content:")
-    debug_print(debug, json.dumps(payload, indent=2))
-    debug_print(debug, "")
+    prefix, _, rest = orjson.dumps(payload).rpartition(orjson.dumps(words_placeholder))
+    middle, _, suffix = rest.partition(orjson.dumps(max_tokens_placeholder))
+    return prefix, middle, suffix
 
-    try:
-        response = requests.post(url, headers=headers, data=json.dumps(payload))
 
-        if response.status_code == 200:
-            result = response.json()
+async def post_with_retries(client: httpx.AsyncClient, rate_limiter: RateLimiter, body: bytes) -> Optional[dict]:
+    """
+    Send a request to OpenRouter API and return the parsed JSON response.
+    Rate limited and transient failures are retried with exponential backoff and jitter,
+    returning None once all retries are used up. Other API errors exit the program.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        await rate_limiter.acquire()
+        rate_limited = False
+        retry_after = 0.0
+        try:
+            response = await client.post(OPENROUTER_URL, content=body)
+        except httpx.TransportError as e:
+            error = f"{type(e).__name__}: {e}"
+        else:
+            rate_limiter.update(response.headers)
+            if response.status_code == 200:
+                return orjson.loads(response.content)
+
+            error = f"{response.status_code} - {response.text}"
+            if response.status_code not in RETRY_STATUSES:
+                print(f"Error from OpenRouter API: {error}")
+                sys.exit(1)
+            rate_limited = response.status_code == 429
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+        if attempt == MAX_RETRIES:
+            break
+
+        delay = max(retry_after, min(60, 2 ** attempt) + random.random())
+        print(f"Error from OpenRouter API: {error}. Retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})...")
+        if rate_limited:
+            # Hold back every batch, not just this one, until the rate limit clears
+            rate_limiter.pause(delay)
+        else:
+            await asyncio.sleep(delay)
 
-            # Log the full API response for debugging
-            debug_print(debug, "Full API response:")
-            debug_print(debug, json.dumps(result, indent=2))
-            debug_print(debug, "")
+    print(f"Error: Giving up on batch after {MAX_RETRIES} retries. Its words will be scored on the next run.")
+    return None
 
-            # Check if choices array exists and is not empty
-            if "choices" in result and result["choices"] and "message" in result["choices"][0] and "content" in result["choices"][0]["message"]:
-                content = result["choices"][0]["message"]["content"]
-
-                # Log the raw LLM response content to the console for debugging
-                debug_print(debug, "Raw LLM response content:")
-                debug_print(debug, content)
-                debug_print(debug, "")
-
-                # Parse the response to extract word:score pairs
-                scores = {}
-                for line in content.strip().split('\n'):
-                    if ':' in line:
-                        word, score_str = line.split(':', 1)
-                        try:
-                            score = int(score_str.strip())
-                            scores[word.strip()] = score
-                        except ValueError:
-                            # Skip lines that don't have a valid integer score
-                            continue
-
-                return scores
-            else:
-                print("Error: Unexpected API response format. Missing expected fields in the response.")
-                debug_print(debug, "Full API response structure:")
-                debug_print(debug, json.dumps(result, indent=2))
-                return {}
-        else:
-            print(f"Error from OpenRouter API: {response.status_code} - {response.text}")
-            sys.exit(1)
 
-    except Exception as e:
-        print(f"Error calling OpenRouter API: {e}")
-        sys.exit(1)
+def parse_retry_after(value: Optional[str]) -> float:
+    """Parse the Retry-After header as a number of seconds, 0 if it is missing or not a number."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
 
 
-def turkish_sort_key(s):
+@functools.cache
+def get_turkish_sort_key():
     """
-    Custom sort key function for Turkish alphabet.
-    Tries to use locale if available, otherwise falls back to custom mapping.
+    Return a sort key function for the Turkish alphabet, set up only once.
+    Uses an ICU collator if PyICU is installed, then the Turkish locale if available,
+    otherwise falls back to a custom mapping.
     """
+    if icu:
+        collator = icu.Collator.createInstance(icu.Locale('tr_TR'))
+        return collator.getSortKey
+
     try:
-        # Try to set Turkish locale
+        # Setting the locale is process-wide and expensive, so it is done here once
         locale.setlocale(locale.LC_COLLATE, 'tr_TR.UTF-8')
-        return locale.strxfrm(s.lower())
+        return lambda s: locale.strxfrm(s.lower())
     except (locale.Error, AttributeError):
-        # Fall back to custom Turkish character mapping if locale setting fails
-        # Turkish alphabet order: a, b, c, ç, d, e, f, g, ğ, h, ı, i, j, k, l, m, n, o, ö, p, r, s, ş, t, u, ü, v, y, z
-        tr_char_map = {
-            'ç': 'c\u0327',  # c comes before ç
-            'ğ': 'g\u0327',  # g comes before ğ
-            'ı': 'i\u0326',  # ı comes before i
-            'i': 'i\u0327',  # i comes after ı
-            'ö': 'o\u0327',  # o comes before ö
-            'ş': 's\u0327',  # s comes before ş
-            'ü': 'u\u0327',  # u comes before ü
-        }
-
-        # Replace Turkish characters with their sortable equivalents
-        result = ''
-        for c in s.lower():
-            result += tr_char_map.get(c, c)
-
-        # Handle digits as numbers
-        return [int(c) if c.isdigit() else c for c in result]
+        return turkish_fallback_sort_key
+
+
+def turkish_fallback_sort_key(s):
+    """Sort key function for the Turkish alphabet using a custom character mapping."""
+    # Replace Turkish characters with their sortable equivalents
+    return s.lower().translate(TURKISH_SORT_TRANSLATION)
 
 
 def debug_print(debug_enabled: bool, *args, **kwargs):
-    """Print debug messages only if debug mode is enabled."""
+    """
+    Print debug messages only if debug mode is enabled.
+    Arguments are evaluated either way, so wrap expensive ones in `if debug:` at the call site.
+    """
     if debug_enabled:
         print(*args, **kwargs)
 
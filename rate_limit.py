@@ -0,0 +1,59 @@
+import asyncio
+import time
+from typing import Mapping, Optional
+
+
+class RateLimiter:
+    """
+    Token bucket that limits how many requests are started per period.
+    It also follows the rate limit headers returned by OpenRouter, pausing all requests
+    until the limit resets once the API reports that no requests are remaining.
+    """
+
+    def __init__(self, max_rate: Optional[float] = None, period: float = 60.0):
+        if max_rate is not None and max_rate <= 0:
+            raise ValueError("max_rate must be positive")
+        self.max_rate = max_rate
+        self.period = period
+        # The bucket must hold at least one whole token, or rates below one request per period never start one
+        self.capacity = max(1.0, max_rate or 0.0)
+        self.tokens = max_rate or 0.0
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    async def acquire(self):
+        """Wait until a request may be started."""
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            if self.max_rate is None:
+                return
+
+            # Refill the bucket for the time passed since the last request
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.max_rate / self.period)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) * self.period / self.max_rate)
+
+    def pause(self, delay: float):
+        """Hold back all requests for the given number of seconds."""
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+
+    def update(self, headers: Mapping[str, str]):
+        """Adjust to the X-RateLimit-* headers of a response."""
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            # OpenRouter reports the reset time as a Unix timestamp in milliseconds
+            reset = float(headers["X-RateLimit-Reset"]) / 1000
+        except (KeyError, ValueError):
+            return
+
+        if remaining <= 0:
+            self.pause(reset - time.time())
+        elif self.max_rate is not None:
+            # Don't start more requests than the API still allows
+            self.tokens = min(self.tokens, remaining)
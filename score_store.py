@@ -0,0 +1,66 @@
+import sqlite3
+from typing import List, Dict, Iterable, Set
+
+# Stay below SQLite's limit on the number of parameters in a statement
+MAX_QUERY_PARAMETERS = 900
+
+
+class ScoreStore:
+    """
+    Scored words stored in SQLite, keeping the highest score for each word.
+    Words the LLM left out of a complete response, because the prompt has it omit low scoring
+    words, are stored separately so that they are not sent again either.
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS scores (word TEXT PRIMARY KEY, score INTEGER NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_score ON scores (score)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS omitted (word TEXT PRIMARY KEY)")
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM scores LIMIT 1").fetchone() is None
+
+    def get_scores(self, words: List[str]) -> Dict[str, int]:
+        """Return the stored scores of the given words that have one."""
+        scores = {}
+        for i in range(0, len(words), MAX_QUERY_PARAMETERS):
+            chunk = words[i:i + MAX_QUERY_PARAMETERS]
+            placeholders = ",".join("?" * len(chunk))
+            scores.update(self.conn.execute(f"SELECT word, score FROM scores WHERE word IN ({placeholders})", chunk))
+        return scores
+
+    def get_all_scores(self) -> Dict[str, int]:
+        return dict(self.conn.execute("SELECT word, score FROM scores"))
+
+    def get_words_with_min_score(self, min_score: int) -> List[str]:
+        """Return the words with a score of at least min_score, using the score index."""
+        return [word for word, in self.conn.execute("SELECT word FROM scores WHERE score >= ?", (min_score,))]
+
+    def add_scores(self, scores: Dict[str, int]):
+        """Store scores in a single transaction, keeping the higher score for words that already have one."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO scores (word, score) VALUES (?, ?) "
+                "ON CONFLICT(word) DO UPDATE SET score = max(score, excluded.score)",
+                scores.items()
+            )
+
+    def get_omitted_words(self, words: List[str]) -> Set[str]:
+        """Return the given words that the LLM omitted before."""
+        omitted = set()
+        for i in range(0, len(words), MAX_QUERY_PARAMETERS):
+            chunk = words[i:i + MAX_QUERY_PARAMETERS]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(f"SELECT word FROM omitted WHERE word IN ({placeholders})", chunk)
+            omitted.update(word for word, in rows)
+        return omitted
+
+    def add_omitted_words(self, words: Iterable[str]):
+        """Record words the LLM omitted from a complete response, in a single transaction."""
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO omitted (word) VALUES (?)", ((word,) for word in words))
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,78 @@
+import json
+import os
+from typing import List, Dict
+
+import faiss
+from sentence_transformers import SentenceTransformer
+
+# Multilingual model that supports Turkish, producing 384-dimensional embeddings
+MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+
+
+class SemanticCache:
+    """
+    Approximate score cache that reuses the score of the most similar previously scored word.
+    Words are embedded locally and indexed with FAISS; the index and the scores are stored
+    next to each other as `<path>.faiss` and `<path>.json`.
+    Words that were given an approximate score are recorded as well and never indexed,
+    so that approximations don't chain across runs.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.92):
+        self.index_file = f"{path}.faiss"
+        self.scores_file = f"{path}.json"
+        self.threshold = threshold
+        self.model = SentenceTransformer(MODEL_NAME)
+
+        if os.path.exists(self.index_file) and os.path.exists(self.scores_file):
+            self.index = faiss.read_index(self.index_file)
+            with open(self.scores_file, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            self.words = data["words"]
+            self.scores = data["scores"]
+            self.approximated = set(data.get("approximated", []))
+        else:
+            # Inner product over L2-normalized vectors is cosine similarity
+            self.index = faiss.IndexFlatIP(self.model.get_sentence_embedding_dimension())
+            self.words = []
+            self.scores = []
+            self.approximated = set()
+        self.indexed = set(self.words)
+
+    def _encode(self, words: List[str]):
+        return self.model.encode(words, normalize_embeddings=True, convert_to_numpy=True).astype('float32')
+
+    def lookup(self, words: List[str]) -> Dict[str, int]:
+        """
+        Return the score of the nearest indexed word for each word whose similarity reaches the threshold.
+        The returned words are recorded as approximated.
+        """
+        if not words or self.index.ntotal == 0:
+            return {}
+
+        similarities, neighbors = self.index.search(self._encode(words), 1)
+        similar_scores = {
+            word: self.scores[neighbor[0]]
+            for word, similarity, neighbor in zip(words, similarities, neighbors)
+            if similarity[0] >= self.threshold
+        }
+        self.approximated.update(similar_scores)
+        return similar_scores
+
+    def add(self, scores: Dict[str, int]):
+        """Index scored words that are not in the index yet, skipping words with an approximate score."""
+        new_words = [word for word in scores if word not in self.indexed and word not in self.approximated]
+        if not new_words:
+            return
+
+        self.index.add(self._encode(new_words))
+        self.words.extend(new_words)
+        self.scores.extend(scores[word] for word in new_words)
+        self.indexed.update(new_words)
+
+    def save(self):
+        """Persist the index, the scores and the approximated words to disk."""
+        faiss.write_index(self.index, self.index_file)
+        with open(self.scores_file, 'w', encoding='utf-8') as file:
+            json.dump({"words": self.words, "scores": self.scores, "approximated": sorted(self.approximated)},
+                      file, ensure_ascii=False)